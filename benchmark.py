@@ -4,20 +4,66 @@ Script de benchmark pour le projet N-Queens
 Compare automatiquement toutes les variantes de modélisation
 """
 
+import asyncio
+import copy
 import subprocess
 import json
+import re
 import csv
 import time
 import os
+import argparse
+import hashlib
+import random
+import shutil
+import threading
+from collections import defaultdict
+from functools import lru_cache
 from pathlib import Path
-from datetime import datetime
+from datetime import datetime, timedelta
+
+import numpy as np
+
+# Bibliothèque minizinc-python (optionnelle, utilisée par --backend python)
+try:
+    import minizinc
+except ImportError:
+    minizinc = None
 
 # Configuration
 MODELS_DIR = Path("models")
 DATA_DIR = Path("data")
 RESULTS_DIR = Path("results")
+CACHE_FILE = RESULTS_DIR / "cache.csv"
+FZN_DIR = RESULTS_DIR / "fzn"  # modèles aplatis, réutilisés d'une exécution à l'autre
 TIMEOUT = 300  # 5 minutes max par instance
 
+# Colonnes des fichiers de résultats (le cache ajoute l'empreinte du modèle)
+FIELDNAMES = [
+    'Model', 'Description', 'N', 'Status', 
+    'Time(s)', 'Nodes', 'Failures', 'Propagations', 'Solutions', 'FlattenTime(s)'
+]
+CACHE_FIELDNAMES = FIELDNAMES + ['Hash']
+
+# Les fichiers CSV sont vidés sur disque toutes les FLUSH_EVERY lignes
+FLUSH_EVERY = 8
+CSV_BUFFER_SIZE = 1 << 16
+
+# Nombre d'instances MiniZinc lancées en parallèle (on garde des cœurs pour Gecode)
+DEFAULT_JOBS = max(1, (os.cpu_count() or 2) // 2)
+
+# Noms des statistiques (selon le solveur) -> clé canonique
+STAT_NAMES = {
+    'nodes': 'nodes',
+    'failures': 'failures',
+    'fails': 'failures',
+    'propagations': 'propagations',
+    'solveTime': 'solveTime',
+}
+
+# Type d'un message --json-stream, lu sans décoder tout l'objet JSON
+MESSAGE_TYPE_RE = re.compile(rb'^\{\s*"type"\s*:\s*"(\w+)"')
+
 # Tailles de N à tester
 N_VALUES = [8, 10, 12, 15, 20, 25, 30, 40, 50]
 
@@ -40,85 +86,295 @@ MODELS = [
     ("15_max_regret.mzn", "Max Regret"),
 ]
 
-def run_minizinc(model_path, data_path, timeout=TIMEOUT):
+def pin(cmd, core):
+    """
+    Préfixe la commande par taskset si un cœur est donné
+    """
+    if core is None:
+        return cmd
+    return ["taskset", "-c", str(core)] + cmd
+
+@lru_cache(maxsize=None)
+def minizinc_version():
     """
-    Lance MiniZinc et récupère les statistiques
+    Renvoie (une seule fois) la sortie de minizinc --version
     """
+    try:
+        return subprocess.run(["minizinc", "--version"], capture_output=True).stdout
+    except OSError:
+        return b''
+
+async def flatten_model(model_path, data_path, timeout=TIMEOUT, core=None):
+    """
+    Aplatit (modèle, données) en FlatZinc, une seule fois par contenu :
+    renvoie le fichier .fzn et le temps d'aplatissement mesuré à sa création
+    """
+    # Un changement de version de MiniZinc invalide les fichiers aplatis
+    version = await asyncio.to_thread(minizinc_version)
+    digest = hashlib.sha1(
+        version + b'\0' + model_path.read_bytes() + b'\0' + data_path.read_bytes()
+    ).hexdigest()
+    fzn_path = FZN_DIR / f"{digest}.fzn"
+    time_path = FZN_DIR / f"{digest}.time"
+    
+    # Le fichier de temps n'est écrit qu'après une compilation complète
+    if time_path.exists():
+        return fzn_path, float(time_path.read_text())
+    
+    FZN_DIR.mkdir(parents=True, exist_ok=True)
     cmd = [
         "minizinc",
         "--solver", "gecode",
-        "--statistics",
-        "--time-limit", str(timeout * 1000),  # en millisecondes
+        "--compile",
+        "--no-output-ozn",
+        "--fzn", str(fzn_path),
         str(model_path),
         str(data_path)
     ]
     
+    start_time = time.time()
+    proc = await asyncio.create_subprocess_exec(
+        *pin(cmd, core),
+        stdout=asyncio.subprocess.DEVNULL,
+        stderr=asyncio.subprocess.PIPE
+    )
     try:
-        start_time = time.time()
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            timeout=timeout
-        )
-        elapsed_time = time.time() - start_time
+        _, stderr = await asyncio.wait_for(proc.communicate(), timeout)
+    finally:
+        # Quelle que soit l'erreur, le processus est tué et attendu
+        if proc.returncode is None:
+            proc.kill()
+            await proc.wait()
+    if proc.returncode != 0:
+        raise subprocess.CalledProcessError(proc.returncode, cmd, stderr=stderr)
+    flatten_time = time.time() - start_time
+    
+    time_path.write_text(f"{flatten_time:.8f}")
+    return fzn_path, flatten_time
+
+def parse_message(line, stats, messages):
+    """
+    Traite une ligne de --json-stream (un objet JSON par message) dès sa réception
+    """
+    if not line.startswith(b'{'):
+        return
+    
+    # Les solutions (les messages les plus longs) sont seulement comptées, sans décodage
+    match = MESSAGE_TYPE_RE.match(line)
+    if match and match.group(1) == b'solution':
+        stats['solutions'] += 1
+        return
+    
+    obj = json.loads(line)
+    kind = obj.get('type')
+    if kind == 'solution':
+        stats['solutions'] += 1
+    elif kind == 'statistics':
+        for name, value in obj['statistics'].items():
+            if name in STAT_NAMES:
+                messages['statistics'][STAT_NAMES[name]] = value
+    elif kind == 'status':
+        messages['status'] = obj['status']
+    elif kind == 'time':
+        messages['time'] = obj['time'] / 1000  # en millisecondes
+    elif kind == 'error':
+        messages['status'] = 'ERROR'
+
+async def run_minizinc(model_path, data_path, timeout=TIMEOUT, core=None):
+    """
+    Aplatit le modèle puis lance Gecode sur le FlatZinc et récupère les statistiques
+    (si core est donné, les processus sont épinglés sur ce cœur avec taskset)
+    """
+    flatten_time = None
+    budget = timeout
+    try:
+        fzn_path, flatten_time = await flatten_model(model_path, data_path, timeout, core)
+        
+        # Aplatissement et résolution se partagent le timeout de l'instance
+        budget = timeout - flatten_time
+        if budget <= 0:
+            raise asyncio.TimeoutError
+        
+        # Seule la résolution du FlatZinc est chronométrée
+        cmd = [
+            "minizinc",
+            "--solver", "gecode",
+            "--parallel", "1",  # Gecode mono-thread : un cœur par instance
+            "--statistics",
+            "--json-stream",
+            "--output-time",
+            "--time-limit", str(int(budget * 1000)),  # en millisecondes
+            str(fzn_path)
+        ]
         
-        # Parser la sortie pour extraire les statistiques
         stats = {
             'status': 'UNKNOWN',
-            'time': elapsed_time,
+            'time': None,
             'nodes': None,
             'failures': None,
             'propagations': None,
-            'solutions': 0
+            'solutions': 0,
+            'flatten_time': flatten_time
         }
+        messages = {'statistics': {}, 'status': None, 'time': None}
+        
+        start_time = time.time()
+        proc = await asyncio.create_subprocess_exec(
+            *pin(cmd, core),
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL
+        )
         
-        # Chercher les statistiques dans stderr (MiniZinc les met là)
-        stderr_lines = result.stdout.split('\n')
-        for line in stderr_lines:
-            if 'nodes' in line.lower():
-                try:
-                    stats['nodes'] = int(line.split('=')[1].strip())
-                except:
-                    pass
-            elif 'failures' in line.lower() or 'fails' in line.lower():
-                try:
-                    stats['failures'] = int(line.split('=')[1].strip())
-                except:
-                    pass
-            elif 'propagations' in line.lower() or 'propagates' in line.lower():
-                try:
-                    stats['propagations'] = int(line.split('=')[1].strip())
-                except:
-                    pass
-            elif 'solveTime' in line:
-                try:
-                    stats['time'] = float(line.split('=')[1].strip().replace('ms', '')) 
-                except:
-                    pass
+        # La sortie est analysée au fil de l'eau : le tube ne se remplit jamais
+        async def drain():
+            async for line in proc.stdout:
+                parse_message(line, stats, messages)
+            await proc.wait()
         
-        # Vérifier si une solution a été trouvée
-        if result.returncode == 0 and 'Q = ' in result.stdout:
+        try:
+            await asyncio.wait_for(drain(), budget)
+        finally:
+            # Timeout, annulation, JSON invalide ou ligne trop longue : le processus
+            # ne doit pas continuer sur son cœur sans être attendu
+            if proc.returncode is None:
+                proc.kill()
+                await proc.wait()
+        elapsed_time = time.time() - start_time
+        
+        raw_stats = messages['statistics']
+        for key in ('nodes', 'failures', 'propagations'):
+            if key in raw_stats:
+                stats[key] = int(raw_stats[key])
+        if 'solveTime' in raw_stats:
+            stats['time'] = float(raw_stats['solveTime'])
+        elif messages['time'] is not None:
+            stats['time'] = messages['time']
+        else:
+            stats['time'] = elapsed_time
+        
+        # Déterminer le statut à partir des messages reçus
+        if stats['solutions'] > 0:
             stats['status'] = 'SAT'
-            stats['solutions'] = result.stdout.count('Q = ')
-        elif result.returncode == 0:
+        elif messages['status'] == 'UNSATISFIABLE':
             stats['status'] = 'UNSAT'
-        elif 'TIMEOUT' in result.stderr or elapsed_time >= timeout - 1:
+        elif messages['status'] == 'UNKNOWN' or elapsed_time >= budget - 1:
             stats['status'] = 'TIMEOUT'
         else:
             stats['status'] = 'ERROR'
         
         return stats
         
-    except subprocess.TimeoutExpired:
+    except asyncio.TimeoutError:
         return {
             'status': 'TIMEOUT',
-            'time': timeout,
+            'time': budget,
+            'nodes': None,
+            'failures': None,
+            'propagations': None,
+            'solutions': 0,
+            'flatten_time': flatten_time
+        }
+    except Exception as e:
+        print(f"Erreur: {e}")
+        return {
+            'status': 'ERROR',
+            'time': None,
             'nodes': None,
             'failures': None,
             'propagations': None,
-            'solutions': 0
+            'solutions': 0,
+            'flatten_time': None
+        }
+
+@lru_cache(maxsize=None)
+def load_solver():
+    """
+    Recherche une fois la configuration du solveur Gecode
+    """
+    return minizinc.Solver.lookup("gecode")
+
+@lru_cache(maxsize=None)
+def load_model(model_path):
+    """
+    Charge une fois le modèle minizinc-python (réutilisé pour chaque N)
+    """
+    return minizinc.Model(model_path)
+
+# Interface du modèle découverte par Instance.analyse() (indépendante de N)
+INTERFACE_ATTRS = (
+    '_method_cache', '_input_cache', '_output_cache',
+    '_has_output_item_cache', '_field_renames',
+)
+# Les premières exécutions d'un modèle, lancées en parallèle, n'analysent qu'une fois
+INTERFACE_LOCK = threading.Lock()
+
+@lru_cache(maxsize=None)
+def load_interface(model_path):
+    """
+    Analyse une fois le modèle (minizinc --model-interface-only) et garde son interface
+    """
+    instance = minizinc.Instance(load_solver(), load_model(model_path))
+    if instance._method_cache is None:
+        instance.analyse()
+    return {attr: copy.copy(getattr(instance, attr)) for attr in INTERFACE_ATTRS}
+
+def new_instance(model_path, n):
+    """
+    Crée une instance prête à résoudre pour N, sans relancer l'analyse du modèle
+    (appels bloquants : à exécuter hors de la boucle asyncio)
+    """
+    with INTERFACE_LOCK:
+        interface = load_interface(model_path)
+    instance = minizinc.Instance(load_solver(), load_model(model_path))
+    for attr, value in interface.items():
+        setattr(instance, attr, copy.copy(value))
+    instance["N"] = n
+    return instance
+
+async def run_minizinc_python(model_path, n, timeout=TIMEOUT):
+    """
+    Résout le modèle avec minizinc-python en ne changeant que la donnée N
+    """
+    try:
+        # Une instance par exécution : Instance.branch() garde un verrou bloquant
+        # (threading.Lock) qui ne doit pas être tenu pendant un await.
+        # La recherche du solveur et l'analyse du modèle lancent minizinc : hors de la boucle.
+        instance = await asyncio.to_thread(new_instance, str(model_path), n)
+        
+        start_time = time.time()
+        result = await instance.solve_async(time_limit=timedelta(seconds=timeout), processes=1)
+        elapsed_time = time.time() - start_time
+        
+        # Les statistiques sont déjà décodées par la bibliothèque
+        statistics = result.statistics
+        solve_time = statistics.get('solveTime')
+        if isinstance(solve_time, timedelta):
+            solve_time = solve_time.total_seconds()
+        flatten_time = statistics.get('flatTime')
+        if isinstance(flatten_time, timedelta):
+            flatten_time = flatten_time.total_seconds()
+        
+        stats = {
+            'status': 'UNKNOWN',
+            'time': solve_time if solve_time is not None else elapsed_time,
+            'nodes': statistics.get('nodes'),
+            'failures': statistics.get('failures'),
+            'propagations': statistics.get('propagations'),
+            'solutions': 1 if result.solution is not None else 0,
+            'flatten_time': flatten_time
         }
+        
+        if result.status.has_solution():
+            stats['status'] = 'SAT'
+        elif result.status == minizinc.Status.UNSATISFIABLE:
+            stats['status'] = 'UNSAT'
+        elif result.status == minizinc.Status.UNKNOWN:
+            stats['status'] = 'TIMEOUT'
+        else:
+            stats['status'] = 'ERROR'
+        
+        return stats
+        
     except Exception as e:
         print(f"Erreur: {e}")
         return {
@@ -127,13 +383,307 @@ def run_minizinc(model_path, data_path, timeout=TIMEOUT):
             'nodes': None,
             'failures': None,
             'propagations': None,
-            'solutions': 0
+            'solutions': 0,
+            'flatten_time': None
         }
 
+def available_cores():
+    """
+    Cœurs utilisables par ce processus (Linux), sinon None : pas d'épinglage possible
+    """
+    if not hasattr(os, "sched_getaffinity") or shutil.which("taskset") is None:
+        return None
+    return sorted(os.sched_getaffinity(0))
+
+async def run_pinned(cores, model_path, data_path):
+    """
+    Réserve un cœur libre le temps d'une exécution MiniZinc
+    """
+    core = await cores.get()
+    try:
+        return await run_minizinc(model_path, data_path, core=core)
+    finally:
+        cores.put_nowait(core)
+
+async def run_tasks(tasks, args, on_result):
+    """
+    Lance les exécutions en parallèle (au plus args.jobs à la fois) ;
+    on_result est appelé dès qu'une exécution se termine
+    """
+    semaphore = asyncio.Semaphore(args.jobs)
+    
+    # Un cœur par worker, attribués à tour de rôle (backend cli uniquement)
+    cores = None
+    cpus = available_cores() if args.backend == "cli" and not args.no_pin else None
+    if cpus:
+        cores = asyncio.Queue()
+        for i in range(args.jobs):
+            cores.put_nowait(cpus[i % len(cpus)])
+    
+    # Après une erreur, les exécutions en attente ne sont plus lancées
+    failed = False
+    
+    async def run_task(task):
+        nonlocal failed
+        model_path, data_path, model_file, description, n, digest = task
+        async with semaphore:
+            if failed:
+                return
+            if args.backend == "python":
+                stats = await run_minizinc_python(model_path, n)
+            elif cores is not None:
+                stats = await run_pinned(cores, model_path, data_path)
+            else:
+                stats = await run_minizinc(model_path, data_path)
+        try:
+            on_result(task, stats)
+        except Exception:
+            failed = True
+            raise
+    
+    # On laisse les exécutions en cours se terminer plutôt que de les annuler :
+    # annuler asyncio pendant le lancement d'un sous-processus peut bloquer la boucle
+    results = await asyncio.gather(*(run_task(task) for task in tasks), return_exceptions=True)
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+
+def parse_args():
+    """
+    Analyse les arguments de la ligne de commande
+    """
+    parser = argparse.ArgumentParser(description="Benchmark des modèles N-Queens")
+    parser.add_argument(
+        "-j", "--jobs", type=int, default=DEFAULT_JOBS,
+        help=f"nombre d'instances MiniZinc en parallèle (défaut: {DEFAULT_JOBS})"
+    )
+    parser.add_argument(
+        "--backend", choices=["cli", "python"], default="cli",
+        help="cli: un processus minizinc par exécution ; "
+             "python: instances minizinc-python chargées une fois par modèle"
+    )
+    parser.add_argument(
+        "--no-pin", action="store_true",
+        help="ne pas épingler chaque instance MiniZinc sur un cœur dédié (taskset)"
+    )
+    parser.add_argument(
+        "--order", choices=["smallest_first", "model_major", "shuffle"], default="smallest_first",
+        help="ordre des exécutions (défaut: petits N d'abord, pour couvrir tous les modèles au plus vite)"
+    )
+    parser.add_argument(
+        "--plan", action="store_true",
+        help="ne rien lancer : estimer la durée des exécutions restantes à partir des résultats passés"
+    )
+    parser.add_argument(
+        "--force", action="store_true",
+        help="relancer toutes les combinaisons, même celles déjà présentes dans le cache"
+    )
+    args = parser.parse_args()
+    if args.jobs < 1:
+        parser.error("--jobs doit être >= 1")
+    if args.backend == "python" and minizinc is None:
+        parser.error("--backend python nécessite le paquet minizinc (pip install minizinc)")
+    return args
+
+def model_hash(model_path):
+    """
+    Empreinte SHA-1 du fichier modèle : toute modification invalide le cache
+    """
+    return hashlib.sha1(model_path.read_bytes()).hexdigest()
+
+def cache_is_current():
+    """
+    Vrai si le cache existe avec les colonnes actuelles (sinon il est réécrit)
+    """
+    if not CACHE_FILE.exists():
+        return False
+    with open(CACHE_FILE, 'r', newline='') as csvfile:
+        return next(csv.reader(csvfile), None) == CACHE_FIELDNAMES
+
+def load_cache():
+    """
+    Charge les résultats définitifs (SAT/UNSAT) déjà obtenus, indexés par (modèle, N, empreinte)
+    """
+    done = {}
+    if not cache_is_current():
+        return done
+    
+    with open(CACHE_FILE, 'r', newline='') as csvfile:
+        for row in csv.DictReader(csvfile):
+            if row['Status'] in ('SAT', 'UNSAT'):
+                done[(row['Model'], int(row['N']), row['Hash'])] = row
+    return done
+
+def build_tasks():
+    """
+    Construit la liste des combinaisons (modèle, N) à exécuter
+    """
+    tasks = []
+    for model_file, description in MODELS:
+        model_path = MODELS_DIR / model_file
+        
+        if not model_path.exists():
+            print(f"Modèle non trouvé: {model_file}")
+            continue
+        
+        digest = model_hash(model_path)
+        
+        for n in N_VALUES:
+            data_path = DATA_DIR / f"n{n}.dzn"
+            
+            if not data_path.exists():
+                print(f" Fichier de données non trouvé: n{n}.dzn")
+                continue
+            
+            tasks.append((model_path, data_path, model_file, description, n, digest))
+    return tasks
+
+def order_tasks(tasks, order):
+    """
+    Ordonne les exécutions : smallest_first (petits N d'abord, tous modèles confondus),
+    model_major (modèle par modèle) ou shuffle (ordre aléatoire)
+    """
+    if order == "smallest_first":
+        # Tri stable : à N égal, l'ordre de MODELS est conservé
+        return sorted(tasks, key=lambda task: task[4])
+    if order == "shuffle":
+        return random.sample(tasks, len(tasks))
+    return list(tasks)
+
+def format_row(model_file, description, n, stats):
+    """
+    Convertit les statistiques d'une exécution en ligne CSV (dans l'ordre de FIELDNAMES)
+    """
+    return (
+        model_file,
+        description,
+        n,
+        stats['status'],
+        f"{stats['time']:.8f}" if stats['time'] is not None else '',
+        stats['nodes'] if stats['nodes'] is not None else '',
+        stats['failures'] if stats['failures'] is not None else '',
+        stats['propagations'] if stats['propagations'] is not None else '',
+        stats['solutions'],
+        f"{stats['flatten_time']:.8f}" if stats['flatten_time'] is not None else ''
+    )
+
+def new_summary():
+    """
+    Agrégats du résumé, mis à jour au fil des résultats (sans relire le CSV)
+    """
+    return {
+        'models': defaultdict(lambda: {'time_sum': 0.0, 'solved': 0, 'total': 0}),
+        'best_per_n': {},  # N -> (temps, description)
+    }
+
+def update_summary(summary, description, n, status, elapsed):
+    """
+    Ajoute un résultat aux agrégats du résumé
+    """
+    model = summary['models'][description]
+    model['total'] += 1
+    if status == 'SAT' and elapsed is not None:
+        model['solved'] += 1
+        model['time_sum'] += elapsed
+        best = summary['best_per_n'].get(n)
+        if best is None or elapsed < best[0]:
+            summary['best_per_n'][n] = (elapsed, description)
+
+def load_history(digests):
+    """
+    Historique par modèle (fichier de résultats le plus récent, complété par le cache) :
+    temps de résolution SAT par N, plus petit N en timeout, temps d'aplatissement.
+    Seules les lignes de la version actuelle de chaque modèle (digests) sont retenues
+    """
+    cached = []
+    stale = set()
+    if cache_is_current():
+        with open(CACHE_FILE, 'r', newline='') as csvfile:
+            for row in csv.DictReader(csvfile):
+                if row['Hash'] == digests.get(row['Model']):
+                    cached.append(row)
+                else:
+                    stale.add(row['Model'])
+    
+    # Le fichier de résultats n'a pas d'empreinte : ignoré pour un modèle modifié depuis
+    rows = []
+    for path in sorted(RESULTS_DIR.glob("benchmark_*.csv"))[-1:]:
+        with open(path, 'r', newline='') as csvfile:
+            rows.extend(row for row in csv.DictReader(csvfile) if row['Model'] not in stale)
+    rows.extend(cached)  # le cache complète et remplace le fichier de résultats
+    
+    times = defaultdict(dict)
+    first_timeout = {}
+    flatten_times = defaultdict(list)
+    for row in rows:
+        model, n = row['Model'], int(row['N'])
+        if row['Status'] == 'SAT' and row['Time(s)']:
+            times[model][n] = float(row['Time(s)'])
+        elif row['Status'] == 'TIMEOUT':
+            first_timeout[model] = min(n, first_timeout.get(model, n))
+        # Colonne absente des anciens fichiers de résultats
+        if row.get('FlattenTime(s)'):
+            flatten_times[model].append(float(row['FlattenTime(s)']))
+    return times, first_timeout, flatten_times
+
+def fit_power_law(times):
+    """
+    Ajuste temps ≈ a·N^b (régression linéaire en log-log) ; None s'il manque des points
+    """
+    points = [(n, t) for n, t in times.items() if t > 0]
+    if len(points) < 2:
+        return None
+    n_values, durations = np.array(points).T
+    b, log_a = np.polyfit(np.log(n_values), np.log(durations), 1)
+    return np.exp(log_a), b
+
+def plan(pending, jobs):
+    """
+    Estime la durée des exécutions restantes sans les lancer
+    """
+    digests = {task[2]: task[5] for task in pending}
+    times, first_timeout, flatten_times = load_history(digests)
+    fits = {model: fit_power_law(model_times) for model, model_times in times.items()}
+    
+    print("ESTIMATION (résolution ≈ a·N^b + aplatissement moyen, par modèle ;")
+    print("            hors démarrage des processus minizinc):")
+    print("-" * 60)
+    
+    total = 0.0
+    unknown = 0
+    for model_path, data_path, model_file, description, n, digest in pending:
+        # Un timeout déjà observé vaut pour ce N et tous les N plus grands
+        if n >= first_timeout.get(model_file, float('inf')):
+            print(f"⚠ {model_file:30s} N={n:3d} : timeout déjà observé à N={first_timeout[model_file]}")
+            total += TIMEOUT
+            continue
+        
+        fit = fits.get(model_file)
+        if fit is None:
+            # Pas d'historique : on compte le pire cas
+            unknown += 1
+            total += TIMEOUT
+            continue
+        
+        a, b = fit
+        flatten = flatten_times[model_file]
+        predicted = a * n ** b + (sum(flatten) / len(flatten) if flatten else 0.0)
+        if predicted > TIMEOUT:
+            print(f"⚠ {model_file:30s} N={n:3d} : ~{predicted:.0f}s prévus > timeout ({TIMEOUT}s)")
+        total += min(predicted, TIMEOUT)
+    
+    print(f"Exécutions à lancer: {len(pending)}")
+    if unknown:
+        print(f"Sans historique (comptées au timeout): {unknown}")
+    print(f"Temps cumulé estimé: {total:.1f}s")
+    print(f"Durée estimée avec {jobs} instance(s) en parallèle: {total / jobs:.1f}s")
+
 def main():
     """
     Fonction principale : lance tous les benchmarks
     """
+    args = parse_args()
+    
     # Créer le dossier de résultats
     RESULTS_DIR.mkdir(exist_ok=True)
     
@@ -147,70 +697,96 @@ def main():
     print(f"\nNombre de modèles: {len(MODELS)}")
     print(f"Tailles testées: {N_VALUES}")
     print(f"Timeout par instance: {TIMEOUT}s")
+    print(f"Instances en parallèle: {args.jobs}")
+    print(f"Backend: {args.backend}")
     print(f"Total d'exécutions: {len(MODELS) * len(N_VALUES)}")
-    print(f"\nRésultats sauvegardés dans: {results_file}")
+    if not args.plan:
+        print(f"\nRésultats sauvegardés dans: {results_file}")
     print("=" * 80)
     print()
     
-    # Ouvrir le fichier CSV
-    with open(results_file, 'w', newline='') as csvfile:
-        fieldnames = [
-            'Model', 'Description', 'N', 'Status', 
-            'Time(s)', 'Nodes', 'Failures', 'Propagations', 'Solutions'
-        ]
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-        writer.writeheader()
+    tasks = build_tasks()
+    
+    # Reprendre les résultats déjà obtenus pour ce modèle (même empreinte)
+    cache = {} if args.force else load_cache()
+    cached_rows = []
+    pending = []
+    for task in tasks:
+        model_path, data_path, model_file, description, n, digest = task
+        if (model_file, n, digest) in cache:
+            cached_rows.append(cache[(model_file, n, digest)])
+        else:
+            pending.append(task)
+    pending = order_tasks(pending, args.order)
+    
+    if args.plan:
+        plan(pending, args.jobs)
+        return
+    
+    if cached_rows:
+        print(f"{len(cached_rows)} résultats repris du cache ({CACHE_FILE}), --force pour tout relancer")
+        print()
+    
+    new_cache = not cache_is_current()
+    
+    # Ouvrir le fichier CSV (et le cache, complété au fil de l'eau)
+    # (la fermeture des fichiers, y compris sur Ctrl-C, écrit les lignes en attente)
+    with open(results_file, 'w', newline='', buffering=CSV_BUFFER_SIZE) as csvfile, \
+         open(CACHE_FILE, 'w' if new_cache else 'a', newline='',
+              buffering=CSV_BUFFER_SIZE) as cachefile:
+        writer = csv.writer(csvfile)
+        writer.writerow(FIELDNAMES)
+        
+        cache_writer = csv.writer(cachefile)
+        if new_cache:
+            cache_writer.writerow(CACHE_FIELDNAMES)
+        
+        summary = new_summary()
+        
+        # Le fichier horodaté reste complet : on y recopie les résultats du cache
+        writer.writerows(tuple(row[key] for key in FIELDNAMES) for row in cached_rows)
+        csvfile.flush()
+        for row in cached_rows:
+            elapsed = float(row['Time(s)']) if row['Time(s)'] else None
+            update_summary(summary, row['Description'], int(row['N']), row['Status'], elapsed)
         
         # Compteur de progression
-        total = len(MODELS) * len(N_VALUES)
+        total = len(pending)
         current = 0
         
-        # Tester chaque combinaison
-        for model_file, description in MODELS:
-            model_path = MODELS_DIR / model_file
+        def on_result(task, stats):
+            nonlocal current
+            model_path, data_path, model_file, description, n, digest = task
+            current += 1
+            print(f"[{current}/{total}] {model_file:30s} N={n:3d} ... ", end='')
             
-            if not model_path.exists():
-                print(f"Modèle non trouvé: {model_file}")
-                continue
+            # Afficher le résultat
+            if stats['status'] == 'SAT':
+                time_str = f"{stats['time']:.8f}s" if stats['time'] else "N/A"
+                nodes_str = f"{stats['nodes']:,}" if stats['nodes'] else "N/A"
+                print(f"✓ {stats['status']:8s} {time_str:>10s} {nodes_str:>12s} nœuds")
+            elif stats['status'] == 'TIMEOUT':
+                print(f"⏱  TIMEOUT (>{TIMEOUT}s)")
+            else:
+                print(f"✗ {stats['status']}")
             
-            for n in N_VALUES:
-                current += 1
-                data_path = DATA_DIR / f"n{n}.dzn"
-                
-                if not data_path.exists():
-                    print(f" Fichier de données non trouvé: n{n}.dzn")
-                    continue
-                
-                print(f"[{current}/{total}] {model_file:30s} N={n:3d} ... ", end='', flush=True)
-                
-                # Lancer le benchmark
-                stats = run_minizinc(model_path, data_path)
-                
-                # Afficher le résultat
-                if stats['status'] == 'SAT':
-                    time_str = f"{stats['time']:.8f}s" if stats['time'] else "N/A"
-                    nodes_str = f"{stats['nodes']:,}" if stats['nodes'] else "N/A"
-                    print(f"✓ {stats['status']:8s} {time_str:>10s} {nodes_str:>12s} nœuds")
-                elif stats['status'] == 'TIMEOUT':
-                    print(f"⏱  TIMEOUT (>{TIMEOUT}s)")
-                else:
-                    print(f"✗ {stats['status']}")
-                
-                # Écrire dans le CSV
-                writer.writerow({
-                    'Model': model_file,
-                    'Description': description,
-                    'N': n,
-                    'Status': stats['status'],
-                    'Time(s)': f"{stats['time']:.8f}" if stats['time'] is not None else '',
-                    'Nodes': stats['nodes'] if stats['nodes'] is not None else '',
-                    'Failures': stats['failures'] if stats['failures'] is not None else '',
-                    'Propagations': stats['propagations'] if stats['propagations'] is not None else '',
-                    'Solutions': stats['solutions']
-                })
-                
-                # Flush pour voir les résultats en temps réel
+            # Écrire dans le CSV et dans le cache
+            row = format_row(model_file, description, n, stats)
+            writer.writerow(row)
+            cache_writer.writerow(row + (digest,))
+            update_summary(summary, description, n, stats['status'], stats['time'])
+            
+            # Flush régulier pour suivre les résultats sans un appel système par ligne
+            if current % FLUSH_EVERY == 0:
                 csvfile.flush()
+                cachefile.flush()
+        
+        # Les instances MiniZinc sont des sous-processus pilotés par une boucle asyncio
+        try:
+            asyncio.run(run_tasks(pending, args, on_result))
+        except KeyboardInterrupt:
+            print("\nInterruption : exécutions en cours annulées")
+            raise
     
     print()
     print("=" * 80)
@@ -220,26 +796,20 @@ def main():
     
     # Générer un résumé
     print("\n RÉSUMÉ RAPIDE:\n")
-    generate_summary(results_file)
+    generate_summary(summary)
 
-def generate_summary(results_file):
+def generate_summary(summary):
     """
-    Génère un résumé des résultats
+    Génère un résumé des résultats à partir des agrégats
     """
-    # Lire le CSV
-    with open(results_file, 'r') as csvfile:
-        reader = csv.DictReader(csvfile)
-        rows = list(reader)
-    
-    # Trouver le meilleur modèle pour chaque N
+    # Meilleur modèle pour chaque N
     print("Meilleurs modèles par taille:")
     print("-" * 60)
     
     for n in N_VALUES:
-        n_rows = [r for r in rows if r['N'] == str(n) and r['Status'] == 'SAT' and r['Time(s)']]
-        if n_rows:
-            best = min(n_rows, key=lambda x: float(x['Time(s)']))
-            print(f"N={n:3d}: {best['Description']:30s} ({best['Time(s)']:>8s}s)")
+        if n in summary['best_per_n']:
+            best_time, best_desc = summary['best_per_n'][n]
+            print(f"N={n:3d}: {best_desc:30s} ({best_time:.8f}s)")
         else:
             print(f"N={n:3d}: Aucune solution trouvée")
     
@@ -249,14 +819,11 @@ def generate_summary(results_file):
     print("Performance moyenne par modèle:")
     print("-" * 60)
     
-    model_stats = {}
-    for model_file, description in MODELS:
-        model_rows = [r for r in rows if r['Model'] == model_file and r['Status'] == 'SAT' and r['Time(s)']]
-        if model_rows:
-            avg_time = sum(float(r['Time(s)']) for r in model_rows) / len(model_rows)
-            solved = len(model_rows)
-            total = len([r for r in rows if r['Model'] == model_file])
-            model_stats[description] = (avg_time, solved, total)
+    model_stats = {
+        description: (data['time_sum'] / data['solved'], data['solved'], data['total'])
+        for description, data in summary['models'].items()
+        if data['solved']
+    }
     
     # Trier par temps moyen
     sorted_models = sorted(model_stats.items(), key=lambda x: x[1][0])
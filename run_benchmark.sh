@@ -19,7 +19,7 @@ echo ""
 
 # Vérifier les dépendances Python
 echo "Vérification des dépendances Python..."
-if ! python3 -c "import matplotlib, numpy" 2>/dev/null
+if ! python3 -c "import matplotlib, numpy, pandas" 2>/dev/null
 then
     echo "Installation des dépendances Python..."
     pip install -r requirements.txt
@@ -4,177 +4,152 @@ Script de visualisation des résultats du benchmark N-Queens
 Génère des graphiques pour analyser les performances
 """
 
-import csv
+import matplotlib
+matplotlib.use("Agg")  # rendu fichier uniquement, sans interface graphique
 import matplotlib.pyplot as plt
 import numpy as np
+import pandas as pd
 from pathlib import Path
-import sys
+import argparse
+
+# Seules les colonnes utilisées par les graphiques et le résumé sont chargées
+USECOLS = ['Description', 'N', 'Status', 'Time(s)', 'Nodes']
+
+# Colonnes numériques converties une seule fois au chargement
+NUMERIC_COLUMNS = {
+    'N': 'Int64',
+    'Time(s)': 'float64',
+    'Nodes': 'Int64',
+}
 
 def load_results(csv_file):
-    """Charge les résultats depuis un fichier CSV"""
-    with open(csv_file, 'r') as f:
-        reader = csv.DictReader(f)
-        return list(reader)
+    """Charge les résultats depuis un fichier CSV (colonnes typées, lignes mal formées ignorées)"""
+    df = pd.read_csv(csv_file, usecols=USECOLS, on_bad_lines='skip')
+    for column, dtype in NUMERIC_COLUMNS.items():
+        df[column] = pd.to_numeric(df[column], errors='coerce').astype(dtype)
+    df = df.dropna(subset=['N']).astype({'N': 'int64'})
+    
+    # Filtre commun à tous les graphiques, calculé une fois (remplace Status)
+    df['Solved'] = df.pop('Status') == 'SAT'
+    return df.reset_index(drop=True)
+
+def solved(df, column='Time(s)'):
+    """Lignes résolues (SAT) ayant une valeur pour la colonne donnée"""
+    return df[df['Solved'] & df[column].notna()]
 
-def plot_time_comparison(results, output_dir):
+def plot_time_comparison(ax, df):
     """Graphique comparatif des temps d'exécution"""
-    # Organiser les données par modèle
-    models = {}
-    for row in results:
-        if row['Status'] == 'SAT' and row['Time(s)']:
-            model = row['Description']
-            n = int(row['N'])
-            time = float(row['Time(s)'])
-            
-            if model not in models:
-                models[model] = {'N': [], 'Time': []}
-            models[model]['N'].append(n)
-            models[model]['Time'].append(time)
-    
-    # Créer le graphique
-    plt.figure(figsize=(14, 8))
-    
-    for model, data in sorted(models.items()):
-        # Trier par N
-        sorted_indices = np.argsort(data['N'])
-        n_values = np.array(data['N'])[sorted_indices]
-        times = np.array(data['Time'])[sorted_indices]
-        
-        plt.plot(n_values, times, marker='o', label=model, linewidth=2, markersize=6)
+    sat = solved(df).sort_values('N')
     
-    plt.xlabel('Taille N', fontsize=12)
-    plt.ylabel('Temps (secondes)', fontsize=12)
-    plt.title('Comparaison des temps d\'exécution - N-Queens', fontsize=14, fontweight='bold')
-    plt.legend(bbox_to_anchor=(1.05, 1), loc='upper left', fontsize=9)
-    plt.grid(True, alpha=0.3)
-    plt.yscale('log')
-    plt.tight_layout()
+    for model, grp in sat.groupby('Description'):
+        ax.plot(grp['N'], grp['Time(s)'], marker='o', label=model, linewidth=2, markersize=6,
+                rasterized=True)
     
-    output_file = output_dir / 'time_comparison.png'
-    plt.savefig(output_file, dpi=300, bbox_inches='tight')
-    print(f"✓ Graphique sauvegardé: {output_file}")
-    plt.close()
+    ax.set_xlabel('Taille N', fontsize=12)
+    ax.set_ylabel('Temps (secondes)', fontsize=12)
+    ax.set_title('Comparaison des temps d\'exécution - N-Queens', fontsize=14, fontweight='bold')
+    ax.legend(bbox_to_anchor=(1.05, 1), loc='upper left', fontsize=9)
+    ax.grid(True, alpha=0.3)
+    ax.set_yscale('log')
 
-def plot_nodes_comparison(results, output_dir):
+def plot_nodes_comparison(ax, df):
     """Graphique comparatif du nombre de nœuds explorés"""
-    models = {}
-    for row in results:
-        if row['Status'] == 'SAT' and row['Nodes']:
-            model = row['Description']
-            n = int(row['N'])
-            nodes = int(row['Nodes'])
-            
-            if model not in models:
-                models[model] = {'N': [], 'Nodes': []}
-            models[model]['N'].append(n)
-            models[model]['Nodes'].append(nodes)
-    
-    plt.figure(figsize=(14, 8))
-    
-    for model, data in sorted(models.items()):
-        sorted_indices = np.argsort(data['N'])
-        n_values = np.array(data['N'])[sorted_indices]
-        nodes = np.array(data['Nodes'])[sorted_indices]
-        
-        plt.plot(n_values, nodes, marker='s', label=model, linewidth=2, markersize=6)
+    sat = solved(df, 'Nodes').sort_values('N')
     
-    plt.xlabel('Taille N', fontsize=12)
-    plt.ylabel('Nombre de nœuds explorés', fontsize=12)
-    plt.title('Comparaison du nombre de nœuds - N-Queens', fontsize=14, fontweight='bold')
-    plt.legend(bbox_to_anchor=(1.05, 1), loc='upper left', fontsize=9)
-    plt.grid(True, alpha=0.3)
-    plt.yscale('log')
-    plt.tight_layout()
+    for model, grp in sat.groupby('Description'):
+        ax.plot(grp['N'], grp['Nodes'], marker='s', label=model, linewidth=2, markersize=6,
+                rasterized=True)
     
-    output_file = output_dir / 'nodes_comparison.png'
-    plt.savefig(output_file, dpi=300, bbox_inches='tight')
-    print(f"✓ Graphique sauvegardé: {output_file}")
-    plt.close()
+    ax.set_xlabel('Taille N', fontsize=12)
+    ax.set_ylabel('Nombre de nœuds explorés', fontsize=12)
+    ax.set_title('Comparaison du nombre de nœuds - N-Queens', fontsize=14, fontweight='bold')
+    ax.legend(bbox_to_anchor=(1.05, 1), loc='upper left', fontsize=9)
+    ax.grid(True, alpha=0.3)
+    ax.set_yscale('log')
 
-def plot_best_per_size(results, output_dir):
+def best_per_size(df):
+    """Meilleure ligne (temps minimal) pour chaque N, indexée par N"""
+    sat = solved(df)
+    return sat.loc[sat.groupby('N')['Time(s)'].idxmin()].set_index('N')
+
+def plot_best_per_size(ax, df):
     """Graphique montrant le meilleur modèle pour chaque taille"""
-    n_values = sorted(set(int(r['N']) for r in results))
-    
-    best_models = []
-    best_times = []
+    n_values = np.sort(df['N'].unique())
+    best = best_per_size(df).reindex(n_values)
     
-    for n in n_values:
-        n_results = [r for r in results if int(r['N']) == n and r['Status'] == 'SAT' and r['Time(s)']]
-        if n_results:
-            best = min(n_results, key=lambda x: float(x['Time(s)']))
-            best_models.append(best['Description'][:20])  # Tronquer pour lisibilité
-            best_times.append(float(best['Time(s)']))
-        else:
-            best_models.append('Aucun')
-            best_times.append(0)
+    best_models = best['Description'].fillna('Aucun').str[:20]  # Tronquer pour lisibilité
+    best_times = best['Time(s)'].fillna(0)
     
-    plt.figure(figsize=(12, 6))
-    bars = plt.bar(range(len(n_values)), best_times, color='steelblue', edgecolor='black')
+    bars = ax.bar(range(len(n_values)), best_times, color='steelblue', edgecolor='black')
     
     # Ajouter les noms des modèles sur les barres
-    for i, (bar, model) in enumerate(zip(bars, best_models)):
+    for bar, model in zip(bars, best_models):
         height = bar.get_height()
         if height > 0:
-            plt.text(bar.get_x() + bar.get_width()/2., height,
-                    model, ha='center', va='bottom', rotation=45, fontsize=8)
+            ax.text(bar.get_x() + bar.get_width()/2., height,
+                   model, ha='center', va='bottom', rotation=45, fontsize=8)
     
-    plt.xlabel('Taille N', fontsize=12)
-    plt.ylabel('Temps (secondes)', fontsize=12)
-    plt.title('Meilleur modèle par taille - N-Queens', fontsize=14, fontweight='bold')
-    plt.xticks(range(len(n_values)), [f'N={n}' for n in n_values])
-    plt.grid(True, alpha=0.3, axis='y')
-    plt.tight_layout()
+    ax.set_xlabel('Taille N', fontsize=12)
+    ax.set_ylabel('Temps (secondes)', fontsize=12)
+    ax.set_title('Meilleur modèle par taille - N-Queens', fontsize=14, fontweight='bold')
+    ax.set_xticks(range(len(n_values)), [f'N={n}' for n in n_values])
+    ax.grid(True, alpha=0.3, axis='y')
+
+def group_mean(codes, values, mask, size):
+    """Moyenne de values par groupe (codes entiers) sur les lignes retenues, NaN si vide"""
+    mask = mask & ~np.isnan(values)
+    sums = np.bincount(codes[mask], weights=values[mask], minlength=size)
+    counts = np.bincount(codes[mask], minlength=size)
+    return np.divide(sums, counts, out=np.full(size, np.nan), where=counts > 0)
+
+def aggregate_by_model(df):
+    """Agrégats par modèle calculés en une passe vectorisée (moyennes sur les instances SAT)"""
+    models, codes = np.unique(df['Description'].to_numpy(dtype=str), return_inverse=True)
+    solved_mask = df['Solved'].to_numpy()
+    size = len(models)
     
-    output_file = output_dir / 'best_per_size.png'
-    plt.savefig(output_file, dpi=300, bbox_inches='tight')
-    print(f"✓ Graphique sauvegardé: {output_file}")
-    plt.close()
+    total = np.bincount(codes, minlength=size)
+    solved_count = np.bincount(codes, weights=solved_mask, minlength=size).astype(int)
+    return {
+        'model': models,
+        'total': total,
+        'solved': solved_count,
+        'rate': 100 * solved_count / total,
+        'avg_time': group_mean(codes, df['Time(s)'].to_numpy(dtype=float, na_value=np.nan),
+                               solved_mask, size),
+        'avg_nodes': group_mean(codes, df['Nodes'].to_numpy(dtype=float, na_value=np.nan),
+                                solved_mask, size),
+    }
 
-def plot_success_rate(results, output_dir):
+def plot_success_rate(ax, df):
     """Graphique du taux de réussite par modèle"""
-    models_stats = {}
-    
-    for row in results:
-        model = row['Description']
-        if model not in models_stats:
-            models_stats[model] = {'total': 0, 'solved': 0}
-        
-        models_stats[model]['total'] += 1
-        if row['Status'] == 'SAT':
-            models_stats[model]['solved'] += 1
-    
-    # Calculer les taux
-    models = []
-    success_rates = []
+    stats = aggregate_by_model(df)
+    order = np.argsort(-stats['rate'], kind='stable')
     
-    for model, stats in sorted(models_stats.items(), key=lambda x: x[1]['solved']/x[1]['total'], reverse=True):
-        models.append(model[:25])  # Tronquer
-        success_rates.append(100 * stats['solved'] / stats['total'])
+    models = [model[:25] for model in stats['model'][order]]  # Tronquer
+    success_rates = stats['rate'][order]
     
-    plt.figure(figsize=(12, 8))
-    bars = plt.barh(range(len(models)), success_rates, color='forestgreen', edgecolor='black')
+    bars = ax.barh(range(len(models)), success_rates, color='forestgreen', edgecolor='black')
     
     # Ajouter les pourcentages
-    for i, (bar, rate) in enumerate(zip(bars, success_rates)):
-        plt.text(rate + 1, bar.get_y() + bar.get_height()/2,
-                f'{rate:.1f}%', va='center', fontsize=9)
+    for bar, rate in zip(bars, success_rates):
+        ax.text(rate + 1, bar.get_y() + bar.get_height()/2,
+               f'{rate:.1f}%', va='center', fontsize=9)
     
-    plt.yticks(range(len(models)), models, fontsize=9)
-    plt.xlabel('Taux de réussite (%)', fontsize=12)
-    plt.title('Taux de réussite par modèle - N-Queens', fontsize=14, fontweight='bold')
-    plt.xlim(0, 110)
-    plt.grid(True, alpha=0.3, axis='x')
-    plt.tight_layout()
-    
-    output_file = output_dir / 'success_rate.png'
-    plt.savefig(output_file, dpi=300, bbox_inches='tight')
-    print(f"✓ Graphique sauvegardé: {output_file}")
-    plt.close()
+    ax.set_yticks(range(len(models)), models, fontsize=9)
+    ax.set_xlabel('Taux de réussite (%)', fontsize=12)
+    ax.set_title('Taux de réussite par modèle - N-Queens', fontsize=14, fontweight='bold')
+    ax.set_xlim(0, 110)
+    ax.grid(True, alpha=0.3, axis='x')
 
-def generate_summary_table(results, output_dir):
+def generate_summary_table(df, output_dir):
     """Génère un tableau récapitulatif en format texte"""
     output_file = output_dir / 'summary.txt'
     
+    # Agrégats par modèle, triés par temps moyen (modèles sans solution en dernier)
+    stats = aggregate_by_model(df)
+    order = np.argsort(np.nan_to_num(stats['avg_time'], nan=np.inf), kind='stable')
+    
     with open(output_file, 'w') as f:
         f.write("=" * 100 + "\n")
         f.write("RÉSUMÉ DES RÉSULTATS - PROJET N-QUEENS\n")
@@ -186,31 +161,12 @@ def generate_summary_table(results, output_dir):
         f.write(f"{'Modèle':<35} {'Temps moy':<12} {'Nœuds moy':<15} {'Réussis/Total':<15} {'Taux':<10}\n")
         f.write("-" * 100 + "\n")
         
-        models_data = {}
-        for row in results:
-            model = row['Description']
-            if model not in models_data:
-                models_data[model] = {'times': [], 'nodes': [], 'total': 0, 'solved': 0}
+        for i in order:
+            avg_time = np.nan_to_num(stats['avg_time'][i])
+            avg_nodes = np.nan_to_num(stats['avg_nodes'][i])
             
-            models_data[model]['total'] += 1
-            if row['Status'] == 'SAT':
-                models_data[model]['solved'] += 1
-                if row['Time(s)']:
-                    models_data[model]['times'].append(float(row['Time(s)']))
-                if row['Nodes']:
-                    models_data[model]['nodes'].append(int(row['Nodes']))
-        
-        # Trier par temps moyen
-        sorted_models = sorted(models_data.items(), 
-                             key=lambda x: np.mean(x[1]['times']) if x[1]['times'] else float('inf'))
-        
-        for model, data in sorted_models:
-            avg_time = np.mean(data['times']) if data['times'] else 0
-            avg_nodes = np.mean(data['nodes']) if data['nodes'] else 0
-            rate = 100 * data['solved'] / data['total']
-            
-            f.write(f"{model:<35} {avg_time:>10.3f}s {avg_nodes:>14,.0f} "
-                   f"{data['solved']:>6}/{data['total']:<6} {rate:>8.1f}%\n")
+            f.write(f"{stats['model'][i]:<35} {avg_time:>10.3f}s {avg_nodes:>14,.0f} "
+                   f"{stats['solved'][i]:>6}/{stats['total'][i]:<6} {stats['rate'][i]:>8.1f}%\n")
         
         f.write("\n" + "=" * 100 + "\n\n")
         
@@ -220,13 +176,12 @@ def generate_summary_table(results, output_dir):
         f.write(f"{'N':<6} {'Modèle':<35} {'Temps':<12} {'Nœuds':<15}\n")
         f.write("-" * 100 + "\n")
         
-        n_values = sorted(set(int(r['N']) for r in results))
-        for n in n_values:
-            n_results = [r for r in results if int(r['N']) == n and r['Status'] == 'SAT' and r['Time(s)']]
-            if n_results:
-                best = min(n_results, key=lambda x: float(x['Time(s)']))
-                nodes = int(best['Nodes']) if best['Nodes'] else 0
-                f.write(f"{n:<6} {best['Description']:<35} {float(best['Time(s)']):>10.3f}s {nodes:>14,}\n")
+        best = best_per_size(df)
+        for n in np.sort(df['N'].unique()):
+            if n in best.index:
+                row = best.loc[n]
+                nodes = 0 if pd.isna(row['Nodes']) else int(row['Nodes'])
+                f.write(f"{n:<6} {row['Description']:<35} {row['Time(s)']:>10.3f}s {nodes:>14,}\n")
             else:
                 f.write(f"{n:<6} {'Aucune solution':<35}\n")
         
@@ -234,13 +189,34 @@ def generate_summary_table(results, output_dir):
     
     print(f"✓ Résumé textuel sauvegardé: {output_file}")
 
+# Graphiques générés : (fonction, fichier, taille de la figure)
+PLOTS = [
+    (plot_time_comparison, 'time_comparison.png', (14, 8)),
+    (plot_nodes_comparison, 'nodes_comparison.png', (14, 8)),
+    (plot_best_per_size, 'best_per_size.png', (12, 6)),
+    (plot_success_rate, 'success_rate.png', (12, 8)),
+]
+
+# Résolution des PNG : écran par défaut, --hires pour les rapports
+DPI = 150
+HIRES_DPI = 300
+
+def parse_args():
+    """Analyse les arguments de la ligne de commande"""
+    parser = argparse.ArgumentParser(
+        description="Visualisation des résultats du benchmark N-Queens",
+        epilog="Exemple: python visualize.py results/benchmark_20240115_143022.csv"
+    )
+    parser.add_argument("csv_file", type=Path, help="fichier de résultats CSV")
+    parser.add_argument("--hires", action="store_true",
+                        help=f"exporter en {HIRES_DPI} dpi (rapports) au lieu de {DPI} dpi")
+    parser.add_argument("--fast", action="store_true",
+                        help="style matplotlib 'fast' (simplification des tracés)")
+    return parser.parse_args()
+
 def main():
-    if len(sys.argv) < 2:
-        print("Usage: python visualize.py <fichier_resultats.csv>")
-        print("\nExemple: python visualize.py results/benchmark_20240115_143022.csv")
-        return
-    
-    csv_file = Path(sys.argv[1])
+    args = parse_args()
+    csv_file = args.csv_file
     
     if not csv_file.exists():
         print(f"Erreur: fichier {csv_file} introuvable")
@@ -253,23 +229,33 @@ def main():
     print()
     
     # Charger les résultats
-    results = load_results(csv_file)
-    print(f"✓ {len(results)} résultats chargés")
+    df = load_results(csv_file)
+    print(f"✓ {len(df)} résultats chargés")
     
     # Créer le dossier de sortie
     output_dir = csv_file.parent / 'visualizations'
     output_dir.mkdir(exist_ok=True)
     print(f"✓ Dossier de sortie: {output_dir}\n")
     
-    # Générer les graphiques
+    # Générer les graphiques sur une seule figure réutilisée
     print("Génération des graphiques...")
-    plot_time_comparison(results, output_dir)
-    plot_nodes_comparison(results, output_dir)
-    plot_best_per_size(results, output_dir)
-    plot_success_rate(results, output_dir)
+    if args.fast:
+        plt.style.use('fast')
+    dpi = HIRES_DPI if args.hires else DPI
+    fig, ax = plt.subplots(figsize=(14, 8))
+    for plot, filename, figsize in PLOTS:
+        ax.clear()
+        fig.set_size_inches(figsize)
+        plot(ax, df)
+        fig.tight_layout()
+        
+        output_file = output_dir / filename
+        fig.savefig(output_file, dpi=dpi, bbox_inches='tight')
+        print(f"✓ Graphique sauvegardé: {output_file}")
+    plt.close(fig)
     
     print("\nGénération du résumé textuel...")
-    generate_summary_table(results, output_dir)
+    generate_summary_table(df, output_dir)
     
     print("\n" + "=" * 80)
     print("VISUALISATIONS TERMINÉES!")